@@ -3,13 +3,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import os
-import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 
 from core.file_processor import FileProcessor
 from core.nlp_engine import NlpEngine
 from core.ml_models import MLModels
+from core.job_profiles import JobProfileRegistry
+from core.duplicate_index import DuplicateIndex
 
 app = FastAPI(
     title="AI-Powered Resume Parser API",
@@ -18,6 +19,9 @@ app = FastAPI(
     openapi_tags=[{
         "name": "resume",
         "description": "Operations with resume parsing and analysis"
+    }, {
+        "name": "jobs",
+        "description": "Registered job profiles with precomputed matching artifacts"
     }]
 )
 
@@ -34,6 +38,15 @@ app.add_middleware(
 file_processor = FileProcessor()
 nlp_engine = NlpEngine()
 ml_models = MLModels()
+job_registry = JobProfileRegistry(ml_models)
+duplicate_index = DuplicateIndex(
+    storage_path=os.environ.get("RESUME_DUPLICATE_INDEX_PATH"),
+    threshold=float(os.environ.get("RESUME_DUPLICATE_THRESHOLD", "0.9"))
+)
+if os.environ.get("RESUME_DUPLICATE_RETENTION_DAYS"):
+    duplicate_index.purge(
+        datetime.now() - timedelta(days=float(os.environ["RESUME_DUPLICATE_RETENTION_DAYS"]))
+    )
 
 class JobDescription(BaseModel):
     title: str
@@ -41,31 +54,62 @@ class JobDescription(BaseModel):
     requirements: List[str]
     preferred_qualifications: Optional[List[str]] = None
 
+def _get_job_profile(job_id: str) -> Dict[str, Any]:
+    """Look up a registered job profile or raise a 404"""
+    try:
+        return job_registry.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job profile not found: {job_id}")
+
 @app.post("/parse-resume", tags=["resume"])
 async def parse_resume(
     file: UploadFile = File(...), 
-    job_description: Optional[str] = None
+    job_description: Optional[str] = None,
+    job_id: Optional[str] = None,
+    reuse_duplicates: bool = True
 ):
-    """Parse resume and optionally match against job description"""
+    """Parse resume and optionally match against job description or registered job"""
     try:
-        # Save uploaded file temporarily
+        job_profile = _get_job_profile(job_id)["artifacts"] if job_id else None
+        
+        # Process the upload in memory
         file_ext = os.path.splitext(file.filename)[1]
-        temp_file = f"temp_{uuid.uuid4()}{file_ext}"
+        text = file_processor.extract_text(file.file, file_ext)
         
-        with open(temp_file, "wb") as buffer:
-            buffer.write(file.file.read())
+        # Look for a near-duplicate resume; with reuse_duplicates off the upload is
+        # neither looked up nor stored in the index
+        signature = duplicate_index.signature(text) if reuse_duplicates else None
+        duplicate = duplicate_index.find_near_duplicate(text, signature) if signature is not None else None
+        duplicate_of = None
+        index_id = None
+        if duplicate:
+            changes = duplicate_index.diff(duplicate["doc_id"], text)
+            duplicate_of = {
+                "doc_id": duplicate["doc_id"],
+                "similarity": duplicate["similarity"],
+                "changes": changes,
+                "reused": not nlp_engine.edits_affect_entities(changes, duplicate["parse"])
+            }
             
-        # Process file
-        text = file_processor.extract_text(temp_file)
-        entities = nlp_engine.extract_entities(text)
-        
-        # Normalize skills
-        if 'skills' in entities:
-            entities['skills'] = ml_models.normalize_skills(entities['skills'])
+        if duplicate_of and duplicate_of["reused"]:
+            # The edits leave the stored entities intact; contact details are cheap to re-check
+            entities = duplicate["parse"]
+            entities["contact"] = nlp_engine.extract_contact_info(text)
+        else:
+            entities = nlp_engine.extract_entities(text)
+            
+            # Normalize skills
+            if 'skills' in entities:
+                entities['skills'] = ml_models.normalize_skills(entities['skills'])
+                
+            if signature is not None:
+                index_id = duplicate_index.add(text, entities, signature)
             
         # Calculate compatibility if job description provided
         compatibility = None
-        if job_description:
+        if job_profile:
+            compatibility = ml_models.calculate_profile_compatibility(entities, job_profile)
+        elif job_description:
             try:
                 job_data = json.loads(job_description)
             except json.JSONDecodeError:
@@ -73,40 +117,164 @@ async def parse_resume(
                 
             compatibility = ml_models.calculate_compatibility(entities, job_data)
         
-        # Clean up
-        os.remove(temp_file)
-        
         return {
             "success": True,
             "data": entities,
             "compatibility": compatibility,
+            "duplicate_of": duplicate_of,
+            "index_id": index_id,
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/match-resume", tags=["resume"])
 async def match_resume(
     resume_data: Dict[str, Any], 
-    job_description: JobDescription
+    job_description: Optional[JobDescription] = None,
+    job_id: Optional[str] = None
 ):
-    """Match existing resume data against job description"""
+    """Match existing resume data against job description or registered job"""
+    if job_description is None and job_id is None:
+        raise HTTPException(status_code=422, detail="Either job_description or job_id is required")
     try:
+        job_profile = _get_job_profile(job_id)["artifacts"] if job_id else None
+        
         # Normalize skills if not already done
         if 'skills' in resume_data:
             resume_data['skills'] = ml_models.normalize_skills(resume_data['skills'])
             
-        compatibility = ml_models.calculate_compatibility(resume_data, job_description)
+        if job_profile:
+            compatibility = ml_models.calculate_profile_compatibility(resume_data, job_profile)
+        else:
+            compatibility = ml_models.calculate_compatibility(
+                resume_data, job_description.model_dump()
+            )
         
         return {
             "success": True,
             "compatibility": compatibility,
             "timestamp": datetime.now().isoformat()
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/rank-resumes", tags=["resume"])
+async def rank_resumes(
+    candidates: List[Dict[str, Any]],
+    job_description: Optional[JobDescription] = None,
+    job_id: Optional[str] = None,
+    top_k: int = 10,
+    mode: str = "cascade",
+    advance_fraction: float = 0.2,
+    advance_threshold: Optional[float] = None,
+    evaluate_recall: bool = False
+):
+    """Rank parsed resumes against a job description or registered job"""
+    if job_description is None and job_id is None:
+        raise HTTPException(status_code=422, detail="Either job_description or job_id is required")
+    try:
+        if job_id:
+            job_profile = _get_job_profile(job_id)["artifacts"]
+        else:
+            job_profile = ml_models.build_job_profile(job_description.model_dump())
+            
+        ranking = ml_models.rank_candidates(
+            candidates,
+            job_profile,
+            top_k=top_k,
+            mode=mode,
+            advance_fraction=advance_fraction,
+            advance_threshold=advance_threshold,
+            evaluate_recall=evaluate_recall
+        )
+        
+        return {
+            "success": True,
+            "ranking": ranking,
+            "timestamp": datetime.now().isoformat()
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete("/resume-index/{doc_id}", tags=["resume"])
+async def delete_indexed_resume(doc_id: str):
+    """Remove a resume's stored text and parse from the duplicate index"""
+    try:
+        duplicate_index.delete(doc_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Indexed resume not found: {doc_id}")
+    return {
+        "success": True,
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/job-profiles", tags=["jobs"])
+async def create_job_profile(job_description: JobDescription):
+    """Register a job description and precompute its matching artifacts"""
+    try:
+        profile = job_registry.register(job_description.model_dump())
+        return {
+            "success": True,
+            "job_profile": JobProfileRegistry.summarize(profile),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/job-profiles", tags=["jobs"])
+async def list_job_profiles():
+    """List registered job profiles"""
+    return {
+        "success": True,
+        "job_profiles": job_registry.list_profiles(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/job-profiles/{job_id}", tags=["jobs"])
+async def get_job_profile(job_id: str):
+    """Fetch a registered job profile"""
+    profile = _get_job_profile(job_id)
+    return {
+        "success": True,
+        "job_profile": JobProfileRegistry.summarize(profile),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.put("/job-profiles/{job_id}", tags=["jobs"])
+async def update_job_profile(job_id: str, job_description: JobDescription):
+    """Replace a registered job description and recompute its artifacts"""
+    try:
+        profile = job_registry.update(job_id, job_description.model_dump())
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job profile not found: {job_id}")
+    return {
+        "success": True,
+        "job_profile": JobProfileRegistry.summarize(profile),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.delete("/job-profiles/{job_id}", tags=["jobs"])
+async def delete_job_profile(job_id: str):
+    """Remove a registered job profile"""
+    try:
+        job_registry.delete(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job profile not found: {job_id}")
+    return {
+        "success": True,
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/health", tags=["system"])
 async def health_check():
     """Health check endpoint"""
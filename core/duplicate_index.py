@@ -0,0 +1,243 @@
+import difflib
+import hashlib
+import json
+import re
+import sqlite3
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple, Union
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+class DuplicateIndex:
+    """Disk-backed MinHash LSH index for spotting near-duplicate resumes before parsing"""
+
+    def __init__(
+        self,
+        storage_path: Optional[Union[str, Path]] = None,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        if storage_path is None:
+            storage_path = Path(__file__).parent.parent / "data" / "duplicate_index.db"
+        self.storage_path = Path(storage_path)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # The band layout only decides which documents are compared; the threshold
+        # is applied to the estimated Jaccard at query time, so it can change freely.
+        # The default 32 bands of 4 rows surfaces pairs from roughly 0.5 similarity up.
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Universal hash functions (a * x + b) mod p, one per permutation
+        rng = np.random.RandomState(seed)
+        self.perm_a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.perm_b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.storage_path), check_same_thread=False)
+        self._initialize_storage({
+            "num_perm": num_perm,
+            "shingle_size": shingle_size,
+            "seed": seed
+        })
+
+    def _initialize_storage(self, params: Dict[str, int]):
+        """Create tables, check signatures are compatible and rebuild buckets if the banding changed"""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                text BLOB NOT NULL,
+                parse TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, bucket BLOB NOT NULL, doc_id TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_buckets ON buckets (band, bucket);
+            CREATE INDEX IF NOT EXISTS idx_bucket_docs ON buckets (doc_id);
+        """)
+        stored = dict(self.conn.execute("SELECT key, value FROM metadata"))
+        expected = {key: str(value) for key, value in params.items()}
+        if not stored:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO metadata (key, value) VALUES (?, ?)",
+                    list(expected.items()) + [("bands", str(self.bands))]
+                )
+            return
+            
+        # Signatures built with other hash parameters cannot be compared at all
+        if {key: stored.get(key) for key in expected} != expected:
+            raise ValueError(
+                f"Duplicate index at {self.storage_path} was built with different parameters: {stored}"
+            )
+        if stored.get("bands") != str(self.bands):
+            self._rebuild_buckets()
+
+    def _rebuild_buckets(self):
+        """Re-band every stored signature after the band layout changed"""
+        with self.conn:
+            self.conn.execute("DELETE FROM buckets")
+            for doc_id, stored in self.conn.execute("SELECT doc_id, signature FROM documents").fetchall():
+                signature = np.frombuffer(stored, dtype=np.uint32)
+                self.conn.executemany(
+                    "INSERT INTO buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                    [(band, key, doc_id) for band, key in enumerate(self._band_keys(signature))]
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES ('bands', ?)", (str(self.bands),)
+            )
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the word shingles of text, or None if it has no words"""
+        tokens = re.findall(r"\w+", text.lower())
+        if not tokens:
+            return None
+        if len(tokens) < self.shingle_size:
+            shingles = {" ".join(tokens)}
+        else:
+            shingles = {
+                " ".join(tokens[i:i + self.shingle_size])
+                for i in range(len(tokens) - self.shingle_size + 1)
+            }
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+        # Permute in blocks so memory stays bounded for very long documents
+        signature = np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        for start in range(0, len(hashes), 4096):
+            block = hashes[start:start + 4096]
+            permuted = ((np.outer(block, self.perm_a) + self.perm_b) % MERSENNE_PRIME) & MAX_HASH
+            signature = np.minimum(signature, permuted.min(axis=0))
+        return signature.astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Split a signature into LSH band keys"""
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def query(self, text: str, signature: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """Find indexed documents whose estimated Jaccard similarity reaches the threshold"""
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return []
+
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            rows = self.conn.execute(
+                "SELECT doc_id FROM buckets WHERE band = ? AND bucket = ?", (band, key)
+            )
+            candidates.update(doc_id for (doc_id,) in rows)
+
+        matches = []
+        for doc_id in candidates:
+            (stored,) = self.conn.execute(
+                "SELECT signature FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            similarity = float(np.mean(np.frombuffer(stored, dtype=np.uint32) == signature))
+            if similarity >= self.threshold:
+                matches.append((doc_id, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def find_near_duplicate(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+        """Return the closest indexed near-duplicate with its stored parse, if any"""
+        matches = self.query(text, signature)
+        if not matches:
+            return None
+        doc_id, similarity = matches[0]
+        (parse,) = self.conn.execute(
+            "SELECT parse FROM documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        return {
+            "doc_id": doc_id,
+            "similarity": similarity,
+            "parse": json.loads(parse)
+        }
+
+    def add(self, text: str, parse: Dict[str, Any], signature: Optional[np.ndarray] = None) -> Optional[str]:
+        """Index a parsed document, returning its ID (None if the text has no words)"""
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return None
+
+        doc_id = str(uuid.uuid4())
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO documents (doc_id, signature, text, parse, created_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    doc_id,
+                    signature.tobytes(),
+                    zlib.compress(text.encode('utf-8')),
+                    json.dumps(parse),
+                    datetime.now().isoformat()
+                )
+            )
+            self.conn.executemany(
+                "INSERT INTO buckets (band, bucket, doc_id) VALUES (?, ?, ?)",
+                [(band, key, doc_id) for band, key in enumerate(self._band_keys(signature))]
+            )
+        return doc_id
+
+    def diff(self, doc_id: str, text: str) -> List[Dict[str, str]]:
+        """Word-level changes between an indexed document and new text"""
+        row = self.conn.execute(
+            "SELECT text FROM documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Document not found: {doc_id}")
+        old_words = zlib.decompress(row[0]).decode('utf-8').split()
+        new_words = text.split()
+
+        changes = []
+        matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+        for op, i1, i2, j1, j2 in matcher.get_opcodes():
+            if op != "equal":
+                changes.append({
+                    "op": op,
+                    "old": " ".join(old_words[i1:i2]),
+                    "new": " ".join(new_words[j1:j2])
+                })
+        return changes
+
+    def delete(self, doc_id: str):
+        """Remove a document, its stored text and its parse from the index"""
+        with self.conn:
+            deleted = self.conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,)).rowcount
+            self.conn.execute("DELETE FROM buckets WHERE doc_id = ?", (doc_id,))
+        if not deleted:
+            raise KeyError(f"Document not found: {doc_id}")
+
+    def purge(self, older_than: datetime) -> int:
+        """Remove documents indexed before a cutoff, returning how many were removed"""
+        cutoff = older_than.isoformat()
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM buckets WHERE doc_id IN (SELECT doc_id FROM documents WHERE created_at < ?)",
+                (cutoff,)
+            )
+            return self.conn.execute("DELETE FROM documents WHERE created_at < ?", (cutoff,)).rowcount
+
+    def close(self):
+        """Close the underlying database connection"""
+        self.conn.close()
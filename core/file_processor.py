@@ -1,68 +1,196 @@
 import os
+import posixpath
 import re
+import zipfile
+from xml.etree import ElementTree
 from pdfminer.high_level import extract_text as pdf_extract_text
-from docx import Document
 import pytesseract
 from PIL import Image
-from typing import Optional
+from typing import BinaryIO, Iterator, List, Optional, Union
 from pathlib import Path
 
+# WordprocessingML tags read by the streaming DOCX extractor
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+W_TEXT = W_NS + "t"
+W_TAB = W_NS + "tab"
+W_BREAKS = {W_NS + "br", W_NS + "cr"}
+W_PARAGRAPH = W_NS + "p"
+W_ROW = W_NS + "tr"
+W_CELL = W_NS + "tc"
+W_CONTAINERS = {W_NS + "body", W_NS + "hdr", W_NS + "ftr"}
+# mc:Fallback repeats mc:Choice content (e.g. VML copies of text boxes) and
+# w:tabs holds tab stop definitions, not tab characters
+SKIPPED_TAGS = {MC_NS + "Fallback", W_NS + "tabs"}
+
+# OPC relationships used to locate the main document and its headers/footers
+RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+REL_TYPE_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+REL_OFFICE_DOCUMENT = REL_TYPE_NS + "officeDocument"
+REL_HEADER = REL_TYPE_NS + "header"
+REL_FOOTER = REL_TYPE_NS + "footer"
+
 class FileProcessor:
     def __init__(self):
         # Configure Tesseract path (update for your system)
         self.tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
         pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
 
-    def extract_text(self, file_path: str) -> str:
-        """Extract text from various file formats"""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+    def extract_text(self, source: Union[str, BinaryIO], file_ext: Optional[str] = None) -> str:
+        """Extract text from a file path, or from a binary file object given its extension"""
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                raise FileNotFoundError(f"File not found: {source}")
+            file_ext = file_ext or Path(source).suffix
+        elif not file_ext:
+            raise ValueError("file_ext is required when extracting from a file object")
 
-        file_ext = Path(file_path).suffix.lower()
+        file_ext = file_ext.lower()
         
         if file_ext == '.pdf':
-            return self._extract_from_pdf(file_path)
+            return self._extract_from_pdf(source)
         elif file_ext == '.docx':
-            return self._extract_from_docx(file_path)
+            return self._extract_from_docx(source)
         elif file_ext in ('.png', '.jpg', '.jpeg'):
-            return self._extract_from_image(file_path)
+            return self._extract_from_image(source)
         elif file_ext == '.txt':
-            return self._extract_from_txt(file_path)
+            return self._extract_from_txt(source)
         else:
             raise ValueError(f"Unsupported file format: {file_ext}")
 
-    def _extract_from_pdf(self, file_path: str) -> str:
+    def _extract_from_pdf(self, source: Union[str, BinaryIO]) -> str:
         """Extract text from PDF files"""
         try:
-            text = pdf_extract_text(file_path)
+            text = pdf_extract_text(source)
             return self._clean_text(text)
         except Exception as e:
             raise ValueError(f"PDF extraction failed: {str(e)}")
 
-    def _extract_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX files"""
+    def _extract_from_docx(self, source: Union[str, BinaryIO]) -> str:
+        """Extract text from DOCX files or in-memory buffers, including tables, text boxes, headers and footers"""
         try:
-            doc = Document(file_path)
-            full_text = []
-            for para in doc.paragraphs:
-                full_text.append(para.text)
+            with zipfile.ZipFile(source) as archive:
+                main_parts = self._docx_relationships(archive, "", REL_OFFICE_DOCUMENT)
+                if not main_parts:
+                    raise ValueError("no main document part")
+                main_part = main_parts[0]
+                headers = self._docx_relationships(archive, main_part, REL_HEADER)
+                footers = self._docx_relationships(archive, main_part, REL_FOOTER)
+                
+                # First-page and even-page variants often repeat the default
+                # header/footer, so each distinct one is emitted once
+                full_text = self._distinct_docx_parts(archive, headers)
+                full_text.extend(self._iter_docx_part(archive, main_part))
+                full_text.extend(self._distinct_docx_parts(archive, footers))
             return '\n'.join(full_text)
         except Exception as e:
             raise ValueError(f"DOCX extraction failed: {str(e)}")
-
-    def _extract_from_image(self, file_path: str) -> str:
+    
+    def _docx_relationships(self, archive: zipfile.ZipFile, part_name: str, rel_type: str) -> List[str]:
+        """Resolve the targets of a part's relationships of one type (package root if part_name is empty)"""
+        part_dir, part_file = posixpath.split(part_name)
+        rels_name = posixpath.join(part_dir, "_rels", f"{part_file}.rels")
+        try:
+            rels = ElementTree.fromstring(archive.read(rels_name))
+        except KeyError:
+            return []
+            
+        targets = []
+        for rel in rels.iter(RELS_NS + "Relationship"):
+            if rel.get("Type") != rel_type or rel.get("TargetMode") == "External":
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target = target.lstrip("/")
+            else:
+                target = posixpath.normpath(posixpath.join(part_dir, target))
+            if target not in targets:
+                targets.append(target)
+        return targets
+    
+    def _distinct_docx_parts(self, archive: zipfile.ZipFile, part_names: List[str]) -> List[str]:
+        """Lines of each part whose text differs from the parts before it"""
+        lines = []
+        seen = set()
+        for part_name in part_names:
+            part_lines = tuple(self._iter_docx_part(archive, part_name))
+            if any(part_lines) and part_lines not in seen:
+                seen.add(part_lines)
+                lines.extend(part_lines)
+        return lines
+    
+    def _iter_docx_part(self, archive: zipfile.ZipFile, part_name: str) -> Iterator[str]:
+        """Stream lines of text from a WordprocessingML part in document order.
+        
+        Text boxes are nested inside the paragraph they are anchored to; their
+        lines follow that paragraph's own line.
+        """
+        paragraphs = []  # runs of open paragraphs, innermost last
+        rows = []        # cell texts of open table rows
+        buffers = []     # finished lines held by each open paragraph or table cell
+        skip_depth = 0
+        container = None
+        
+        with archive.open(part_name) as part:
+            for event, elem in ElementTree.iterparse(part, events=("start", "end")):
+                tag = elem.tag
+                if tag in SKIPPED_TAGS:
+                    skip_depth += 1 if event == "start" else -1
+                    continue
+                if skip_depth:
+                    continue
+                    
+                if event == "start":
+                    if tag == W_PARAGRAPH:
+                        paragraphs.append([])
+                        buffers.append([])
+                    elif tag == W_ROW:
+                        rows.append([])
+                    elif tag == W_CELL:
+                        buffers.append([])
+                    elif tag in W_CONTAINERS and container is None:
+                        container = elem
+                    continue
+                
+                lines = None
+                if tag == W_TEXT and paragraphs:
+                    paragraphs[-1].append(elem.text or "")
+                elif tag == W_TAB and paragraphs:
+                    paragraphs[-1].append("\t")
+                elif tag in W_BREAKS and paragraphs:
+                    paragraphs[-1].append("\n")
+                elif tag == W_PARAGRAPH:
+                    lines = ["".join(paragraphs.pop())] + buffers.pop()
+                elif tag == W_CELL:
+                    rows[-1].append(" ".join(text for text in buffers.pop() if text))
+                elif tag == W_ROW:
+                    lines = ["\t".join(rows.pop())]
+                    
+                if lines is not None:
+                    # Lines inside a paragraph or cell wait for it to close
+                    if buffers:
+                        buffers[-1].extend(lines)
+                    else:
+                        yield from lines
+                    # Drop finished top-level blocks so memory stays flat on large files
+                    if not buffers and not rows and container is not None:
+                        container.clear()
+    
+    def _extract_from_image(self, source: Union[str, BinaryIO]) -> str:
         """Extract text from image files using OCR"""
         try:
-            img = Image.open(file_path)
+            img = Image.open(source)
             text = pytesseract.image_to_string(img)
             return self._clean_text(text)
         except Exception as e:
             raise ValueError(f"Image OCR failed: {str(e)}")
 
-    def _extract_from_txt(self, file_path: str) -> str:
+    def _extract_from_txt(self, source: Union[str, BinaryIO]) -> str:
         """Extract text from plain text files"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            if not isinstance(source, str):
+                return source.read().decode('utf-8')
+            with open(source, 'r', encoding='utf-8') as f:
                 return f.read()
         except Exception as e:
             raise ValueError(f"Text file reading failed: {str(e)}")
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import pickle
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Union
+
+from core.ml_models import MLModels
+
+class JobProfileRegistry:
+    """Persistent store of job descriptions and their precomputed matching artifacts"""
+
+    def __init__(self, ml_models: MLModels, storage_path: Optional[Union[str, Path]] = None):
+        self.ml_models = ml_models
+        if storage_path is None:
+            storage_path = Path(__file__).parent.parent / "data" / "job_profiles.pkl"
+        self.storage_path = Path(storage_path)
+        self.profiles = self._load_profiles()
+
+    def _load_profiles(self) -> Dict[str, Dict[str, Any]]:
+        """Load registered job profiles from disk"""
+        try:
+            with open(self.storage_path, 'rb') as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.PickleError):
+            return {}
+
+    def _save_profiles(self):
+        """Write profiles to disk, replacing the previous file atomically"""
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.storage_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(temp_file, 'wb') as f:
+            pickle.dump(self.profiles, f)
+        os.replace(temp_file, self.storage_path)
+
+    @staticmethod
+    def _job_hash(job_description: Union[Dict[str, Any], str]) -> str:
+        """Stable content hash of a job description"""
+        canonical = json.dumps(job_description, sort_keys=True)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _build_profile(self, job_id: str, job_description: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+        """Compute a fresh profile record for a job description"""
+        return {
+            "job_id": job_id,
+            "job_description": job_description,
+            "job_hash": self._job_hash(job_description),
+            "artifacts": self.ml_models.build_job_profile(job_description),
+            "updated_at": datetime.now().isoformat()
+        }
+
+    def _is_stale(self, profile: Dict[str, Any]) -> bool:
+        """Check whether stored artifacts were built by a different model version"""
+        return profile["artifacts"].get("model_version") != self.ml_models.model_version
+
+    def register(self, job_description: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+        """Register a job description and precompute its artifacts"""
+        job_id = str(uuid.uuid4())
+        self.profiles[job_id] = self._build_profile(job_id, job_description)
+        self._save_profiles()
+        return self.profiles[job_id]
+
+    def update(self, job_id: str, job_description: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+        """Replace a registered job description, recomputing artifacts if it changed"""
+        if job_id not in self.profiles:
+            raise KeyError(f"Job profile not found: {job_id}")
+        profile = self.profiles[job_id]
+        if profile["job_hash"] != self._job_hash(job_description) or self._is_stale(profile):
+            self.profiles[job_id] = self._build_profile(job_id, job_description)
+            self._save_profiles()
+        return self.profiles[job_id]
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """Fetch a job profile, recomputing its artifacts if they are out of date"""
+        if job_id not in self.profiles:
+            raise KeyError(f"Job profile not found: {job_id}")
+        profile = self.profiles[job_id]
+        if self._is_stale(profile):
+            profile = self._build_profile(job_id, profile["job_description"])
+            self.profiles[job_id] = profile
+            self._save_profiles()
+        return profile
+
+    def delete(self, job_id: str):
+        """Remove a registered job profile"""
+        if job_id not in self.profiles:
+            raise KeyError(f"Job profile not found: {job_id}")
+        del self.profiles[job_id]
+        self._save_profiles()
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Summaries of all registered job profiles"""
+        return [self.summarize(profile) for profile in self.profiles.values()]
+
+    @staticmethod
+    def summarize(profile: Dict[str, Any]) -> Dict[str, Any]:
+        """JSON-safe view of a profile without the raw vectors"""
+        return {
+            "job_id": profile["job_id"],
+            "job_description": profile["job_description"],
+            "skills": profile["artifacts"]["skills"],
+            "model_version": profile["artifacts"]["model_version"],
+            "updated_at": profile["updated_at"]
+        }
@@ -7,15 +7,29 @@ import torch
 import pickle
 from pathlib import Path
 import json
+import hashlib
+import heapq
+import math
+from collections import Counter
 from typing import Dict, List, Optional, Any, Union
 import re
 
+# Bump whenever the layout or computation of job profile artifacts changes
+JOB_PROFILE_ARTIFACT_VERSION = 1
+
+# Weights of the compatibility score components
+SBERT_WEIGHT = 0.5
+TFIDF_WEIGHT = 0.3
+SKILL_WEIGHT = 0.2
+
 class MLModels:
     def __init__(self):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.skill_normalizer = self._load_skill_normalizer()
-        self.sbert_model = SentenceTransformer('all-MiniLM-L6-v2', device=self.device)
+        self.sbert_model_name = 'all-MiniLM-L6-v2'
+        self.sbert_model = SentenceTransformer(self.sbert_model_name, device=self.device)
         self.job_vectorizer = TfidfVectorizer(stop_words='english')
+        self.model_version = self._compute_model_version()
         
     def _load_skill_normalizer(self) -> Dict[str, str]:
         """Load skill normalization mappings"""
@@ -34,6 +48,13 @@ class MLModels:
             }
             return default_normalizer
     
+    def _compute_model_version(self) -> str:
+        """Fingerprint of everything job profile artifacts depend on"""
+        normalizer_digest = hashlib.sha256(
+            json.dumps(self.skill_normalizer, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+        return f"{self.sbert_model_name}:{normalizer_digest}:v{JOB_PROFILE_ARTIFACT_VERSION}"
+    
     def normalize_skills(self, skills: List[str]) -> List[str]:
         """Normalize skill names to standard taxonomy"""
         normalized = []
@@ -69,28 +90,70 @@ class MLModels:
         job_description: Union[Dict[str, Any], str]
     ) -> Dict[str, float]:
         """Calculate compatibility score between resume and job description"""
-        # Prepare text for comparison
-        resume_text = self._prepare_resume_text(resume_data)
+        job_profile = self.build_job_profile(job_description)
+        return self.calculate_profile_compatibility(resume_data, job_profile)
+    
+    def build_job_profile(self, job_description: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+        """Precompute the job-side matching artifacts (skills, term counts, embedding)"""
         job_text = self._prepare_job_text(job_description)
         
+        if isinstance(job_description, dict) and 'requirements' in job_description:
+            job_skills = job_description['requirements']
+        else:
+            # Extract skills from raw job description text
+            job_skills = self._extract_skills_from_text(str(job_description))
+        
+        # TF-IDF weights depend on the document pair being compared, so the
+        # job side is stored as raw term frequencies and weighted at match time
+        return {
+            "model_version": self.model_version,
+            "job_text": job_text,
+            "skills": self.normalize_skills(job_skills) if job_skills else [],
+            "term_counts": self._term_counts(job_text),
+            "embedding": self.sbert_model.encode(job_text)
+        }
+    
+    def calculate_profile_compatibility(
+        self, 
+        resume_data: Dict[str, Any], 
+        job_profile: Dict[str, Any]
+    ) -> Dict[str, float]:
+        """Calculate compatibility score between resume and a precomputed job profile"""
+        # Prepare text for comparison
+        resume_text = self._prepare_resume_text(resume_data)
+        resume_embedding = self.sbert_model.encode(resume_text)
+        return self._profile_compatibility(resume_data, resume_text, resume_embedding, job_profile)
+    
+    def _profile_compatibility(
+        self, 
+        resume_data: Dict[str, Any], 
+        resume_text: str, 
+        resume_embedding: np.ndarray, 
+        job_profile: Dict[str, Any], 
+        tfidf_sim: Optional[float] = None
+    ) -> Dict[str, float]:
+        """Combine all score components for a resume whose embedding (and optionally TF-IDF) is already computed"""
         # Calculate TF-IDF similarity
-        try:
-            tfidf_matrix = self.job_vectorizer.fit_transform([resume_text, job_text])
-            tfidf_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-        except ValueError:
-            tfidf_sim = 0.0
+        if tfidf_sim is None:
+            tfidf_sim = self._tfidf_similarity(
+                self._term_counts(resume_text), 
+                job_profile['term_counts']
+            )
         
         # Calculate semantic similarity with SBERT
-        sbert_sim = self._calculate_sbert_similarity(resume_text, job_text)
+        sbert_sim = cosine_similarity(
+            np.asarray(resume_embedding).reshape(1, -1), 
+            np.asarray(job_profile['embedding']).reshape(1, -1)
+        )[0][0]
         
         # Calculate skill match
         skill_match = self._skill_match_score(
             resume_data.get('skills', []), 
-            job_description
+            job_profile['skills']
         )
         
         # Combined score (weighted average)
-        combined_score = 0.5 * sbert_sim + 0.3 * tfidf_sim + 0.2 * skill_match
+        combined_score = SBERT_WEIGHT * sbert_sim + TFIDF_WEIGHT * tfidf_sim + SKILL_WEIGHT * skill_match
         
         return {
             "overall_score": float(np.clip(combined_score, 0, 1)),
@@ -99,6 +162,171 @@ class MLModels:
             "skill_match": float(np.clip(skill_match, 0, 1))
         }
     
+    def rank_candidates(
+        self, 
+        candidates: List[Dict[str, Any]], 
+        job_profile: Dict[str, Any], 
+        top_k: int = 10, 
+        mode: str = "cascade", 
+        advance_fraction: float = 0.2, 
+        advance_threshold: Optional[float] = None, 
+        evaluate_recall: bool = False
+    ) -> Dict[str, Any]:
+        """Rank candidate resumes against a job profile and return the top_k.
+        
+        In cascade mode skill overlap and TF-IDF are computed for every candidate
+        first; only the top advance_fraction, plus any candidate whose cheap score
+        reaches advance_threshold, is scored with SBERT. Exhaustive mode scores
+        every candidate fully.
+        """
+        if mode not in ("cascade", "exhaustive"):
+            raise ValueError(f"Unsupported ranking mode: {mode}")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        if not 0 < advance_fraction <= 1:
+            raise ValueError("advance_fraction must be in (0, 1]")
+            
+        tfidf_scores = None
+        if mode == "cascade":
+            tfidf_scores = self._cheap_stage(candidates, job_profile, top_k, advance_fraction, advance_threshold)
+            advanced = sorted(tfidf_scores)
+            stages = [{
+                "stage": "cheap",
+                "evaluated": len(candidates),
+                "pruned": len(candidates) - len(advanced)
+            }]
+        else:
+            advanced = list(range(len(candidates)))
+            stages = []
+            
+        results = self._semantic_top_k(candidates, advanced, job_profile, top_k, tfidf_scores)
+        stages.append({
+            "stage": "semantic",
+            "evaluated": len(advanced),
+            "pruned": len(advanced) - len(results)
+        })
+        
+        # Recall of the returned top_k against the exhaustive top_k
+        recall = None
+        if evaluate_recall:
+            if mode == "exhaustive":
+                recall = 1.0
+            else:
+                expected = {
+                    result["index"] for result in 
+                    self._semantic_top_k(candidates, list(range(len(candidates))), job_profile, top_k)
+                }
+                found = {result["index"] for result in results}
+                recall = len(expected & found) / len(expected) if expected else 1.0
+        
+        return {
+            "mode": mode,
+            "total_candidates": len(candidates),
+            "results": results,
+            "stages": stages,
+            "recall": recall
+        }
+    
+    def _cheap_stage(
+        self, 
+        candidates: List[Dict[str, Any]], 
+        job_profile: Dict[str, Any], 
+        top_k: int, 
+        advance_fraction: float, 
+        advance_threshold: Optional[float]
+    ) -> Dict[int, float]:
+        """Score candidates on skill overlap and TF-IDF, returning the TF-IDF of those that advance"""
+        job_skills = set(job_profile['skills'])
+        cheap_scores = []
+        for index, resume_data in enumerate(candidates):
+            tfidf_sim = self._tfidf_similarity(
+                self._term_counts(self._prepare_resume_text(resume_data)), 
+                job_profile['term_counts']
+            )
+            resume_skills = self._lookup_skills(resume_data.get('skills', []))
+            skill_match = len(resume_skills & job_skills) / len(job_skills) if job_skills else 0.0
+            score = (TFIDF_WEIGHT * tfidf_sim + SKILL_WEIGHT * skill_match) / (TFIDF_WEIGHT + SKILL_WEIGHT)
+            cheap_scores.append((score, -index, tfidf_sim))
+        
+        # Bounded heap selection of the top fraction, never fewer than top_k
+        advance_count = max(top_k, math.ceil(advance_fraction * len(candidates)))
+        advanced = {
+            -neg_index: tfidf_sim 
+            for _, neg_index, tfidf_sim in heapq.nlargest(advance_count, cheap_scores)
+        }
+        if advance_threshold is not None:
+            advanced.update(
+                (-neg_index, tfidf_sim) 
+                for score, neg_index, tfidf_sim in cheap_scores if score >= advance_threshold
+            )
+        return advanced
+    
+    def _semantic_top_k(
+        self, 
+        candidates: List[Dict[str, Any]], 
+        indices: List[int], 
+        job_profile: Dict[str, Any], 
+        top_k: int, 
+        tfidf_scores: Optional[Dict[int, float]] = None, 
+        batch_size: int = 256
+    ) -> List[Dict[str, Any]]:
+        """Fully score the given candidates, keeping only the best top_k in a min-heap"""
+        heap = []
+        for batch_start in range(0, len(indices), batch_size):
+            batch = indices[batch_start:batch_start + batch_size]
+            texts = [self._prepare_resume_text(candidates[index]) for index in batch]
+            embeddings = self.sbert_model.encode(texts)
+            for index, text, embedding in zip(batch, texts, embeddings):
+                compatibility = self._profile_compatibility(
+                    candidates[index], 
+                    text, 
+                    embedding, 
+                    job_profile, 
+                    tfidf_scores.get(index) if tfidf_scores else None
+                )
+                # Ties go to the earlier candidate
+                entry = (compatibility["overall_score"], -index, compatibility)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, entry)
+                    
+        return [
+            {"index": -neg_index, "compatibility": compatibility}
+            for _, neg_index, compatibility in sorted(heap, key=lambda entry: entry[:2], reverse=True)
+        ]
+    
+    def _lookup_skills(self, skills: List[str]) -> set:
+        """Map skills to canonical names by exact lookup only, skipping similarity search"""
+        return {self.skill_normalizer.get(skill.lower(), skill.title()) for skill in skills}
+    
+    def _term_counts(self, text: str) -> Dict[str, int]:
+        """Tokenize text the same way the TF-IDF vectorizer does and count terms"""
+        analyzer = self.job_vectorizer.build_analyzer()
+        return dict(Counter(analyzer(text)))
+    
+    def _tfidf_similarity(self, counts1: Dict[str, int], counts2: Dict[str, int]) -> float:
+        """Cosine similarity of two documents under a TF-IDF fit on just that pair"""
+        if not counts1 or not counts2:
+            return 0.0
+        
+        # Smoothed IDF over a two-document corpus: ln((1 + n) / (1 + df)) + 1
+        shared_idf = 1.0
+        single_idf = np.log(3.0 / 2.0) + 1.0
+        
+        def weights(counts, other):
+            return {
+                term: count * (shared_idf if term in other else single_idf)
+                for term, count in counts.items()
+            }
+        
+        weights1 = weights(counts1, counts2)
+        weights2 = weights(counts2, counts1)
+        dot = sum(weight * weights2[term] for term, weight in weights1.items() if term in weights2)
+        norm1 = np.sqrt(sum(w * w for w in weights1.values()))
+        norm2 = np.sqrt(sum(w * w for w in weights2.values()))
+        return float(dot / (norm1 * norm2))
+    
     def _prepare_resume_text(self, resume_data: Dict[str, Any]) -> str:
         """Prepare resume text for comparison"""
         sections = []
@@ -111,7 +339,7 @@ class MLModels:
         
         if resume_data.get('experience'):
             sections.append(" ".join(
-                f"{exp.get('position', '')} {exp.get('company', ')}" 
+                f"{exp.get('position', '')} {exp.get('company', '')}" 
                 for exp in resume_data['experience']
             ))
         
@@ -129,42 +357,24 @@ class MLModels:
             return " ".join([
                 job_description.get('title', ''), 
                 job_description.get('description', ''),
-                " ".join(job_description.get('requirements', [])),
-                " ".join(job_description.get('preferred_qualifications', []))
+                " ".join(job_description.get('requirements') or []),
+                " ".join(job_description.get('preferred_qualifications') or [])
             ])
         return str(job_description)
     
-    def _calculate_sbert_similarity(self, text1: str, text2: str) -> float:
-        """Calculate semantic similarity using SBERT"""
-        embedding1 = self.sbert_model.encode(text1, convert_to_tensor=True)
-        embedding2 = self.sbert_model.encode(text2, convert_to_tensor=True)
-        return cosine_similarity(embedding1.reshape(1, -1), embedding2.reshape(1, -1))[0][0]
-    
     def _skill_match_score(
         self, 
         resume_skills: List[str], 
-        job_description: Union[Dict[str, Any], str]
+        job_skills: List[str]
     ) -> float:
-        """Calculate skill match score"""
-        if not resume_skills:
-            return 0.0
-            
-        if isinstance(job_description, dict) and 'requirements' in job_description:
-            job_skills = job_description['requirements']
-        else:
-            # Extract skills from raw job description text
-            job_skills = self._extract_skills_from_text(str(job_description))
-            
-        if not job_skills:
+        """Calculate skill match score against already-normalized job skills"""
+        if not resume_skills or not job_skills:
             return 0.0
             
         # Normalize skills
         norm_resume_skills = set(self.normalize_skills(resume_skills))
-        norm_job_skills = set(self.normalize_skills(job_skills))
+        norm_job_skills = set(job_skills)
         
-        if not norm_job_skills:
-            return 0.0
-            
         # Calculate matching score
         intersection = norm_resume_skills.intersection(norm_job_skills)
         return len(intersection) / len(norm_job_skills)
@@ -10,9 +10,42 @@ from typing import Dict, List, Optional, Any
 import json
 from pathlib import Path
 
+# Preferred split points for long documents, strongest boundary first
+CHUNK_BOUNDARY_PATTERNS = [
+    re.compile(r"\n\s*\n"),    # paragraph break
+    re.compile(r"[.!?]\s+"),   # sentence end
+    re.compile(r"\n"),         # line break
+    re.compile(r"\s+")         # any whitespace
+]
+
+# Keywords the sentence-level extractors look for
+INSTITUTION_WORDS = ["university", "college", "institute"]
+POSITION_KEYWORDS = ["worked as", "position of", "role of", "as a", "position:"]
+TECH_TERMS = {"programming", "development", "engineering", "framework", 
+              "language", "technology", "tool", "software", "system"}
+CERTIFICATION_KEYWORDS = ["certified", "certification", "license", "licensed", "certificate"]
+PROJECT_KEYWORDS = ["project", "developed", "created", "built", "designed", "implemented"]
+
+# Fields of an extracted work experience entry
+EXPERIENCE_FIELDS = ("company", "position", "duration")
+
 class NlpEngine:
-    def __init__(self):
+    def __init__(
+        self, 
+        max_chunk_chars: int = 50000, 
+        chunk_overlap_chars: int = 1000, 
+        chunk_batch_size: int = 1
+    ):
         self.nlp = spacy.load("en_core_web_lg")
+        if not 0 <= chunk_overlap_chars < max_chunk_chars // 2:
+            raise ValueError("chunk_overlap_chars must be less than half of max_chunk_chars")
+        if max_chunk_chars > self.nlp.max_length:
+            raise ValueError(f"max_chunk_chars exceeds spaCy max_length ({self.nlp.max_length})")
+        # Texts longer than max_chunk_chars are processed in overlapping windows,
+        # at most chunk_batch_size of them in memory at a time
+        self.max_chunk_chars = max_chunk_chars
+        self.chunk_overlap_chars = chunk_overlap_chars
+        self.chunk_batch_size = chunk_batch_size
         self.lemmatizer = WordNetLemmatizer()
         self.stop_words = set(stopwords.words('english'))
         self._initialize_matchers()
@@ -66,18 +99,28 @@ class NlpEngine:
             companies_data = json.load(f)
         self.company_patterns = list(self.nlp.pipe(companies_data["companies"]))
         self.phrase_matcher.add("COMPANIES", self.company_patterns)
+        
+        # Lowercased skill and company phrases, for checking edits without a pipeline run
+        self.known_phrases = {
+            " ".join(self._edit_words(doc.text)) 
+            for doc in self.skill_patterns + self.company_patterns
+        }
     
     def extract_entities(self, text: str) -> Dict[str, Any]:
         """Extract entities from resume text"""
-        doc = self.nlp(text)
-        
+        if len(text) > self.max_chunk_chars:
+            return self._extract_entities_chunked(text)
+        return self._extract_entities_from_doc(self.nlp(text))
+    
+    def _extract_entities_from_doc(self, doc) -> Dict[str, Any]:
+        """Extract entities from a processed spaCy document"""
         # Run matchers
         matches = self.matcher(doc)
         phrase_matches = self.phrase_matcher(doc)
         
         entities = {
             "name": self._extract_name(doc),
-            "contact": self._extract_contact_info(doc),
+            "contact": self.extract_contact_info(doc.text),
             "education": self._extract_education(doc, matches),
             "experience": self._extract_experience(doc, matches, phrase_matches),
             "skills": self._extract_skills(doc, phrase_matches),
@@ -87,6 +130,118 @@ class NlpEngine:
         
         return entities
     
+    def _extract_entities_chunked(self, text: str) -> Dict[str, Any]:
+        """Extract entities from long text by streaming overlapping chunks through the pipeline"""
+        def chunks_with_overlap():
+            previous_end = 0
+            for start, chunk in self._iter_chunks(text):
+                yield chunk, text[start:previous_end]
+                previous_end = start + len(chunk)
+        
+        docs = self.nlp.pipe(chunks_with_overlap(), as_tuples=True, batch_size=self.chunk_batch_size)
+        return self._merge_chunk_entities(
+            (self._extract_entities_from_doc(doc), overlap) for doc, overlap in docs
+        )
+    
+    def _iter_chunks(self, text: str):
+        """Yield (offset, chunk) pairs of overlapping chunks split at paragraph or sentence boundaries"""
+        start = 0
+        while start < len(text):
+            end = min(start + self.max_chunk_chars, len(text))
+            if end < len(text):
+                # Split at the strongest boundary in the second half of the window
+                end = self._find_boundary(text, start + self.max_chunk_chars // 2, end, last=True, default=end)
+            yield start, text[start:end]
+            if end >= len(text):
+                break
+            # Start the next chunk at the first boundary inside the overlap region,
+            # ignoring the whitespace the chunk just ended on so the overlap is never empty
+            lo = end - self.chunk_overlap_chars
+            hi = end
+            while hi > lo and text[hi - 1].isspace():
+                hi -= 1
+            start = self._find_boundary(text, lo, hi, last=False, default=lo)
+    
+    def _find_boundary(self, text: str, lo: int, hi: int, last: bool, default: int) -> int:
+        """Find the first or last boundary position in text[lo:hi], falling back to default"""
+        for pattern in CHUNK_BOUNDARY_PATTERNS:
+            found = None
+            for match in pattern.finditer(text, lo, hi):
+                found = match
+                if not last:
+                    break
+            if found:
+                return found.end()
+        return default
+    
+    def _merge_chunk_entities(self, chunk_results) -> Dict[str, Any]:
+        """Merge (entities, overlap text with the previous chunk) pairs into document-level results"""
+        merged = {
+            "name": None,
+            "contact": {"email": None, "phone": None},
+            "education": [],
+            "experience": [],
+            "skills": set(),
+            "certifications": set(),
+            "projects": set()
+        }
+        seen_education = set()
+        experience_sources = []  # chunk index each merged experience entry came from
+        
+        for chunk_index, (entities, overlap) in enumerate(chunk_results):
+            # Earliest chunk wins for name and email, longest phone number overall
+            if merged["name"] is None:
+                merged["name"] = entities["name"]
+            contact = entities["contact"]
+            if merged["contact"]["email"] is None:
+                merged["contact"]["email"] = contact["email"]
+            if contact["phone"] and len(contact["phone"]) > len(merged["contact"]["phone"] or ""):
+                merged["contact"]["phone"] = contact["phone"]
+                
+            for edu in entities["education"]:
+                identifier = (edu.get('institution', ''), edu.get('degree', ''))
+                if identifier not in seen_education:
+                    seen_education.add(identifier)
+                    merged["education"].append(edu)
+                    
+            # An entry cut off at a chunk edge may miss fields its neighbour found.
+            # Duplicates can only come from the overlap with the previous chunk, so
+            # merge only with that chunk's entries for companies named in the overlap
+            overlap = overlap.lower()
+            for exp in entities["experience"]:
+                for existing, source in zip(merged["experience"], experience_sources):
+                    if (
+                        source == chunk_index - 1
+                        and exp.get("company")
+                        and exp["company"].lower() in overlap
+                        and self._experience_compatible(existing, exp)
+                    ):
+                        for field in EXPERIENCE_FIELDS:
+                            if existing.get(field) is None:
+                                existing[field] = exp.get(field)
+                        break
+                else:
+                    merged["experience"].append(dict(exp))
+                    experience_sources.append(chunk_index)
+                    
+            for key in ("skills", "certifications", "projects"):
+                merged[key].update(entities[key])
+        
+        for key in ("skills", "certifications", "projects"):
+            merged[key] = sorted(merged[key])
+            
+        return merged
+    
+    @staticmethod
+    def _experience_compatible(first: Dict[str, Optional[str]], second: Dict[str, Optional[str]]) -> bool:
+        """Check whether two experience entries could describe the same job"""
+        if first.get("company") != second.get("company"):
+            return False
+        return all(
+            first.get(field) is None or second.get(field) is None or first.get(field) == second.get(field)
+            for field in EXPERIENCE_FIELDS
+        )
+    
     def _extract_name(self, doc) -> Optional[str]:
         """Extract candidate name from document"""
         # First look for PERSON entities
@@ -109,19 +264,65 @@ class NlpEngine:
                             return ' '.join(name_parts)
         return None
     
-    def _extract_contact_info(self, doc) -> Dict[str, Optional[str]]:
-        """Extract contact information (email, phone)"""
+    @staticmethod
+    def _edit_words(text: str) -> List[str]:
+        """Lowercased words of text, keeping symbols used in skill names like C++ and C#"""
+        return [word.strip(".") for word in re.findall(r"[\w+#.]+", text.lower()) if word.strip(".")]
+    
+    def edits_affect_entities(
+        self, 
+        changes: List[Dict[str, str]], 
+        entities: Dict[str, Any], 
+        max_changed_words: int = 20
+    ) -> bool:
+        """Check whether word-level edits could change anything besides contact details.
+        
+        True when the edits are large, touch words of already extracted entities,
+        add a known skill or company, or contain a keyword the extractors react to.
+        """
+        if sum(len(change["old"].split()) + len(change["new"].split()) for change in changes) > max_changed_words:
+            return True
+            
+        entity_words = set()
+        for key, value in entities.items():
+            if key == "contact":
+                continue
+            for item in value if isinstance(value, list) else [value]:
+                for field in item.values() if isinstance(item, dict) else [item]:
+                    if field:
+                        entity_words.update(self._edit_words(field))
+        entity_words -= self.stop_words
+        
+        keywords = (
+            INSTITUTION_WORDS + POSITION_KEYWORDS + list(TECH_TERMS) 
+            + CERTIFICATION_KEYWORDS + PROJECT_KEYWORDS
+        )
+        for change in changes:
+            for side in (change["old"], change["new"]):
+                words = self._edit_words(side)
+                if entity_words.intersection(words):
+                    return True
+                padded = f" {' '.join(words)} "
+                if any(f" {phrase} " in padded for phrase in self.known_phrases):
+                    return True
+                # Parenthesised text is read as an employment duration
+                if "(" in side or any(keyword in side.lower() for keyword in keywords):
+                    return True
+        return False
+    
+    def extract_contact_info(self, text: str) -> Dict[str, Optional[str]]:
+        """Extract contact information (email, phone) with regexes, no pipeline run needed"""
         contact = {"email": None, "phone": None}
         
         # Extract email
         email_regex = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        emails = re.findall(email_regex, doc.text)
+        emails = re.findall(email_regex, text)
         if emails:
             contact["email"] = emails[0]
             
         # Extract phone numbers
         phone_regex = r"(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b"
-        phones = re.findall(phone_regex, doc.text)
+        phones = re.findall(phone_regex, text)
         if phones:
             # Take the longest phone number found
             contact["phone"] = max(phones, key=len)
@@ -134,7 +335,7 @@ class NlpEngine:
         
         # Extract using NER
         for ent in doc.ents:
-            if ent.label_ == "ORG" and any(token.text.lower() in ["university", "college", "institute"] for token in ent):
+            if ent.label_ == "ORG" and any(token.text.lower() in INSTITUTION_WORDS for token in ent):
                 education.append({"institution": ent.text})
                 
         # Extract using patterns
@@ -172,8 +373,7 @@ class NlpEngine:
             text = sent.text.lower()
             
             # Look for position indicators
-            position_keywords = ["worked as", "position of", "role of", "as a", "position:"]
-            for keyword in position_keywords:
+            for keyword in POSITION_KEYWORDS:
                 if keyword in text:
                     parts = text.split(keyword)
                     if len(parts) > 1:
@@ -222,12 +422,9 @@ class NlpEngine:
                 skills.add(doc[start:end].text.lower())
                 
         # Extract from noun chunks that contain technical terms
-        tech_terms = {"programming", "development", "engineering", "framework", 
-                     "language", "technology", "tool", "software", "system"}
-        
         for chunk in doc.noun_chunks:
             chunk_text = chunk.text.lower()
-            if any(term in chunk_text for term in tech_terms):
+            if any(term in chunk_text for term in TECH_TERMS):
                 # Clean and add the chunk
                 clean_chunk = re.sub(r'[^a-zA-Z0-9\s]', '', chunk_text).strip()
                 if 1 <= len(clean_chunk.split()) <= 3:
@@ -238,11 +435,9 @@ class NlpEngine:
     def _extract_certifications(self, doc) -> List[str]:
         """Extract certifications"""
         certs = set()
-        cert_keywords = ["certified", "certification", "license", "licensed", "certificate"]
-        
         for sent in doc.sents:
             sent_lower = sent.text.lower()
-            if any(keyword in sent_lower for keyword in cert_keywords):
+            if any(keyword in sent_lower for keyword in CERTIFICATION_KEYWORDS):
                 # Clean and extract the certification name
                 clean_sent = re.sub(r'[^a-zA-Z0-9\s]', ' ', sent.text).strip()
                 certs.add(clean_sent)
@@ -252,11 +447,9 @@ class NlpEngine:
     def _extract_projects(self, doc) -> List[str]:
         """Extract projects"""
         projects = set()
-        project_keywords = ["project", "developed", "created", "built", "designed", "implemented"]
-        
         for sent in doc.sents:
             sent_lower = sent.text.lower()
-            if any(keyword in sent_lower for keyword in project_keywords):
+            if any(keyword in sent_lower for keyword in PROJECT_KEYWORDS):
                 # Clean and extract the project description
                 clean_sent = re.sub(r'[^a-zA-Z0-9\s]', ' ', sent.text).strip()
                 projects.add(clean_sent)
@@ -2,8 +2,18 @@ import pytest
 from core.file_processor import FileProcessor
 from core.nlp_engine import NlpEngine
 from core.ml_models import MLModels
+from core.job_profiles import JobProfileRegistry
+from core.duplicate_index import DuplicateIndex
+from api import main as api_main
+from fastapi import UploadFile
+from docx import Document
+import asyncio
+import io
 import os
+import zipfile
 from pathlib import Path
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
 
 @pytest.fixture
 def file_processor():
@@ -64,4 +74,264 @@ def test_compatibility_scoring(ml_models):
     }
     score = ml_models.calculate_compatibility(resume_data, job_desc)
     assert score["overall_score"] > 0.5
-    assert score["skill_match"] > 0.5
\ No newline at end of file
+    assert score["skill_match"] > 0.5
+
+
+def test_profile_tfidf_matches_pairwise_vectorizer(ml_models):
+    pairs = [
+        ("Data Scientist Google PhD Stanford University Python Machine Learning",
+         "Data Scientist Looking for a Python expert with ML experience Python Machine Learning"),
+        ("python python java", "java c++ rust rust"),
+        ("Chef Bistro cooking", "Data Scientist Python")
+    ]
+    for resume_text, job_text in pairs:
+        tfidf_matrix = TfidfVectorizer(stop_words='english').fit_transform([resume_text, job_text])
+        expected = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        actual = ml_models._tfidf_similarity(
+            ml_models._term_counts(resume_text), 
+            ml_models._term_counts(job_text)
+        )
+        assert actual == pytest.approx(expected)
+
+def test_job_profile_registry_persists_and_refreshes(ml_models, tmp_path):
+    storage = tmp_path / "job_profiles.pkl"
+    registry = JobProfileRegistry(ml_models, storage_path=storage)
+    job_id = registry.register({"title": "Engineer", "description": "Python", "requirements": ["Python"]})["job_id"]
+
+    reloaded = JobProfileRegistry(ml_models, storage_path=storage)
+    assert reloaded.get(job_id)["artifacts"]["skills"] == ["Python"]
+
+    reloaded.profiles[job_id]["artifacts"]["model_version"] = "outdated"
+    assert reloaded.get(job_id)["artifacts"]["model_version"] == ml_models.model_version
+
+def test_chunked_extraction_overlaps_and_merges():
+    engine = NlpEngine(max_chunk_chars=300, chunk_overlap_chars=100)
+    paragraphs = ["John Doe\njohn.doe@example.com"]
+    paragraphs += [f"Section {i}. Experienced with Python and SQL." for i in range(40)]
+    text = "\n\n".join(paragraphs)
+    assert len(text) > engine.max_chunk_chars
+
+    chunks = list(engine._iter_chunks(text))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= engine.max_chunk_chars for _, chunk in chunks)
+    for (start, chunk), (next_start, _) in zip(chunks, chunks[1:]):
+        assert start < next_start < start + len(chunk)
+
+    entities = engine.extract_entities(text)
+    assert entities["contact"]["email"] == "john.doe@example.com"
+
+def _chunk_entities(experience):
+    return {
+        "name": None,
+        "contact": {"email": None, "phone": None},
+        "education": [],
+        "experience": experience,
+        "skills": [],
+        "certifications": [],
+        "projects": []
+    }
+
+def test_chunk_merge_dedups_experience_cut_at_boundary(nlp_engine):
+    merged = nlp_engine._merge_chunk_entities([
+        (_chunk_entities([{"company": "Google", "position": "Software Engineer", "duration": None}]), ""),
+        (_chunk_entities([
+            {"company": "Google", "position": None, "duration": "2015-2020"},
+            {"company": "Google", "position": "Manager", "duration": "2020-2022"}
+        ]), "Software Engineer at Google")
+    ])
+    assert merged["experience"] == [
+        {"company": "Google", "position": "Software Engineer", "duration": "2015-2020"},
+        {"company": "Google", "position": "Manager", "duration": "2020-2022"}
+    ]
+
+def test_chunk_merge_keeps_same_company_jobs_outside_overlap(nlp_engine):
+    merged = nlp_engine._merge_chunk_entities([
+        (_chunk_entities([{"company": "Google", "position": "Intern", "duration": None}]), ""),
+        (_chunk_entities([]), "Intern at Google"),
+        (_chunk_entities([{"company": "Google", "position": None, "duration": "(2020-2023)"}]), "Team lead"),
+        (_chunk_entities([{"company": "Google", "position": None, "duration": "(2023-2024)"}]), "Worked at Meta")
+    ])
+    assert merged["experience"] == [
+        {"company": "Google", "position": "Intern", "duration": None},
+        {"company": "Google", "position": None, "duration": "(2020-2023)"},
+        {"company": "Google", "position": None, "duration": "(2023-2024)"}
+    ]
+
+def test_cascade_ranking_prunes_and_reports_recall(ml_models):
+    job_profile = ml_models.build_job_profile({
+        "title": "Data Scientist",
+        "description": "Looking for a Python expert with ML experience",
+        "requirements": ["Python", "Machine Learning"]
+    })
+    candidates = [
+        {"skills": ["Python", "Machine Learning"], "experience": [{"company": "Google", "position": "Data Scientist"}]},
+        {"skills": ["Cooking"], "experience": [{"company": "Bistro", "position": "Chef"}]},
+        {"skills": ["Painting"], "experience": [{"company": "Gallery", "position": "Artist"}]},
+        {"skills": ["Python"], "experience": [{"company": "Meta", "position": "Data Analyst"}]},
+    ]
+    ranking = ml_models.rank_candidates(
+        candidates, job_profile, top_k=1, advance_fraction=0.5, evaluate_recall=True
+    )
+    assert ranking["results"][0]["index"] == 0
+    assert ranking["stages"][0] == {"stage": "cheap", "evaluated": 4, "pruned": 2}
+    assert ranking["stages"][1] == {"stage": "semantic", "evaluated": 2, "pruned": 1}
+    assert ranking["recall"] == 1.0
+
+    for advance_fraction in (0, -0.5, 1.5):
+        with pytest.raises(ValueError):
+            ml_models.rank_candidates(candidates, job_profile, advance_fraction=advance_fraction)
+
+def test_cascade_ranking_computes_tfidf_once_per_candidate(ml_models, monkeypatch):
+    job_profile = ml_models.build_job_profile({
+        "title": "Data Scientist",
+        "description": "Python and ML",
+        "requirements": ["Python"]
+    })
+    candidates = [{"skills": ["Python"]}, {"skills": ["Cooking"]}, {"skills": ["Painting"]}]
+    calls = []
+    tfidf_similarity = ml_models._tfidf_similarity
+    monkeypatch.setattr(
+        ml_models, "_tfidf_similarity", 
+        lambda *args: calls.append(args) or tfidf_similarity(*args)
+    )
+    ml_models.rank_candidates(candidates, job_profile, top_k=1, advance_fraction=1.0)
+    assert len(calls) == len(candidates)
+
+def test_duplicate_index_finds_edited_resume(tmp_path):
+    index = DuplicateIndex(storage_path=tmp_path / "duplicates.db", threshold=0.8)
+    resume = " ".join(
+        f"Senior engineer at company {i} building Python data pipelines and ML services"
+        for i in range(30)
+    )
+    doc_id = index.add(resume, {"name": "John Doe"})
+
+    edited = resume.replace("company 7 ", "company seven ")
+    duplicate = index.find_near_duplicate(edited)
+    assert duplicate["doc_id"] == doc_id
+    assert duplicate["parse"] == {"name": "John Doe"}
+    assert index.diff(doc_id, edited) == [{"op": "replace", "old": "7", "new": "seven"}]
+
+    unrelated = " ".join(f"Head chef running kitchen number {i} with seasonal menus" for i in range(30))
+    assert index.find_near_duplicate(unrelated) is None
+    index.close()
+
+    # Threshold and band layout can change without rebuilding from scratch
+    reopened = DuplicateIndex(storage_path=tmp_path / "duplicates.db", threshold=0.7, bands=16)
+    assert reopened.query(resume)[0][0] == doc_id
+
+    reopened.delete(doc_id)
+    assert reopened.find_near_duplicate(resume) is None
+    with pytest.raises(KeyError):
+        reopened.delete(doc_id)
+
+def test_edits_affect_entities(nlp_engine):
+    entities = {
+        "name": "John Doe",
+        "contact": {"email": "john.doe@example.com", "phone": None},
+        "education": [{"institution": "Stanford University"}],
+        "experience": [{"company": "Google", "position": "Engineer", "duration": "2015-2020"}],
+        "skills": ["python"],
+        "certifications": [],
+        "projects": []
+    }
+    email_edit = [{"op": "replace", "old": "john.doe@example.com", "new": "jdoe@newmail.com"}]
+    date_edit = [{"op": "replace", "old": "2015-2020", "new": "2015-2021"}]
+    skill_edit = [{"op": "insert", "old": "", "new": "SQL"}]
+    large_edit = [{"op": "insert", "old": "", "new": " ".join(["word"] * 30)}]
+    assert not nlp_engine.edits_affect_entities(email_edit, entities)
+    assert nlp_engine.edits_affect_entities(date_edit, entities)
+    assert nlp_engine.edits_affect_entities(skill_edit, entities)
+    assert nlp_engine.edits_affect_entities(large_edit, entities)
+
+def test_parse_resume_reuses_near_duplicate_parse(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        api_main, "duplicate_index", 
+        DuplicateIndex(storage_path=tmp_path / "duplicates.db", threshold=0.8)
+    )
+    body = " ".join(
+        f"Senior engineer at company {i} building Python data pipelines." for i in range(30)
+    )
+
+    def upload(email, text=body, reuse_duplicates=True):
+        file = UploadFile(io.BytesIO(f"John Doe {email}\n{text}".encode()), filename="resume.txt")
+        return asyncio.run(api_main.parse_resume(
+            file=file, job_description=None, job_id=None, reuse_duplicates=reuse_duplicates
+        ))
+
+    first = upload("john.doe@example.com")
+
+    # Only the email changed: the stored parse is reused with fresh contact details
+    edited = upload("john.doe@newmail.com")
+    assert edited["duplicate_of"]["doc_id"] == first["index_id"]
+    assert edited["duplicate_of"]["changes"] == [
+        {"op": "replace", "old": "john.doe@example.com", "new": "john.doe@newmail.com"}
+    ]
+    assert edited["duplicate_of"]["reused"] is True
+    assert edited["index_id"] is None
+    assert edited["data"]["skills"] == first["data"]["skills"]
+    assert edited["data"]["contact"]["email"] == "john.doe@newmail.com"
+
+    # An edit touching an extracted skill is parsed again
+    reskilled = upload("john.doe@example.com", body.replace("Python data", "Java data", 1))
+    assert reskilled["duplicate_of"]["reused"] is False
+    assert reskilled["index_id"] is not None
+
+    opted_out = upload("jane.doe@example.com", reuse_duplicates=False)
+    assert opted_out["duplicate_of"] is None
+    assert opted_out["index_id"] is None
+
+def test_docx_streaming_keeps_tables_and_headers(file_processor):
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "John Doe | john.doe@example.com"
+    doc.sections[0].different_first_page_header_footer = True
+    doc.sections[0].first_page_header.paragraphs[0].text = "John Doe | john.doe@example.com"
+    doc.add_paragraph("Experience")
+    table = doc.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "2015-2020"
+    table.rows[0].cells[1].text = "Software Engineer at Google"
+    doc.add_paragraph("Skills: Python")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+
+    text = file_processor.extract_text(buffer, ".docx")
+    assert text.splitlines() == [
+        "John Doe | john.doe@example.com",
+        "Experience",
+        "2015-2020\tSoftware Engineer at Google",
+        "Skills: Python"
+    ]
+
+def test_docx_text_box_fallback_is_not_duplicated(file_processor):
+    namespaces = (
+        'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+        'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+    )
+    document = f"""<w:document {namespaces}><w:body>
+        <w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>
+            <w:r><w:t>Name</w:t><w:tab/><w:t>Jane Doe</w:t></w:r>
+            <w:r><mc:AlternateContent>
+                <mc:Choice Requires="wps"><w:drawing><w:txbxContent>
+                    <w:p><w:r><w:t>Skills: Go, Rust</w:t></w:r></w:p>
+                </w:txbxContent></w:drawing></mc:Choice>
+                <mc:Fallback><w:pict><w:txbxContent>
+                    <w:p><w:r><w:t>Skills: Go, Rust</w:t></w:r></w:p>
+                </w:txbxContent></w:pict></mc:Fallback>
+            </mc:AlternateContent></w:r>
+        </w:p>
+    </w:body></w:document>"""
+    package_rels = (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="word/document.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("_rels/.rels", package_rels)
+        archive.writestr("word/document.xml", document)
+    buffer.seek(0)
+
+    text = file_processor.extract_text(buffer, ".docx")
+    # The text box follows the paragraph it is anchored in
+    assert text.splitlines() == ["Name\tJane Doe", "Skills: Go, Rust"]